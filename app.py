@@ -3,19 +3,35 @@ Main Flask application factory.
 """
 import logging
 from flask import Flask, request, jsonify, render_template
+from sqlalchemy import text
 from config import CurrentConfig
 from extensions import db, socketio, redis_client
 from utils import setup_logging
 import os
-
-# --- 修正点 ---
-# db.create_all() が User モデルを認識できるように、
-# ここで明示的にインポートします。
-import models 
-# --- 修正完了 ---
+import time
 
 logger = logging.getLogger(__name__)
 
+# Readiness probes reuse a successful Redis ping for this many seconds.
+REDIS_HEALTH_TTL = 1.0
+
+def init_db():
+    """
+    Creates database tables if they don't exist.
+    Must be called within an application context.
+    """
+    # db.create_all() が User モデルを認識できるように、
+    # ここで明示的にインポートします (import 時の副作用を避けるため関数内で)。
+    import models
+
+    try:
+        db.create_all()
+        logger.info("Database tables checked/created.")
+    except Exception as e:
+        logger.error(f"Failed to initialize database: {e}")
+        raise
+
+
 def create_app() -> Flask:
     """
     Creates and configures the Flask application instance.
@@ -37,29 +53,40 @@ def create_app() -> Flask:
 
     # Initialize extensions (CIRCULAR_IMPORT_BAN)
     db.init_app(app)
-    socketio.init_app(app)
+    socketio.init_app(app, message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'])
     logger.info("Database and SocketIO extensions initialized.")
 
-    with app.app_context():
-        # Create database tables if they don't exist.
-        try:
-            # models.py がインポート済みなので、ここで 'user' テーブルが作成されます
-            db.create_all()
-            logger.info("Database tables checked/created.")
-        except Exception as e:
-            logger.error(f"Failed to initialize database: {e}")
-            raise
+    if app.config['INIT_DB']:
+        with app.app_context():
+            init_db()
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create database tables if they don't exist."""
+        init_db()
 
     # @app.route('/') # <-- このルートは game_bp にあります
     
-    # Health check for load balancers
+    # Liveness check: the process is up and serving requests
+    @app.route('/health/live')
+    def liveness_check():
+        return jsonify({'status': 'ok'}), 200
+
+    # Last successful Redis ping, shared by readiness probes
+    redis_health = {'last_ok': 0.0}
+
+    # Readiness check for load balancers (database and Redis)
     @app.route('/health')
+    @app.route('/health/ready')
     def health_check():
         try:
             # Check DB connection
-            db.session.execute('SELECT 1')
-            # Check Redis connection
-            redis_client.ping()
+            db.session.execute(text('SELECT 1'))
+            # Check Redis connection, at most once per REDIS_HEALTH_TTL
+            now = time.monotonic()
+            if now - redis_health['last_ok'] >= REDIS_HEALTH_TTL:
+                redis_client.ping()
+                redis_health['last_ok'] = now
             return jsonify({'status': 'ok', 'database': 'ok', 'redis': 'ok'}), 200
         except Exception as e:
             logger.error(f"Health check failed: {e}")
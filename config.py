@@ -8,33 +8,66 @@ ensuring critical settings like `SECRET_KEY` are present and by separating
 secrets from general configuration flags.
 """
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
+from dotenv import dotenv_values
 
-# Load environment variables from .env file if it exists
-# This ensures that secrets are loaded from the correct place.
-load_dotenv()
+# Parse the .env file once into a module-level mapping.
+# Real environment variables always take precedence over .env values.
+# In production the real environment is authoritative, so .env is skipped.
+if os.environ.get('FLASK_ENV') != 'production':
+    _dotenv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+    _ENV = {**dotenv_values(_dotenv_path), **os.environ}
+else:
+    _ENV = dict(os.environ)
+
+# Single lookup shared by the config classes and `get_config()`.
+_FLASK_ENV = _ENV.get('FLASK_ENV', 'development')
 
 class Config:
     """
     Base configuration class for the Flask application.
     """
-    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SECRET_KEY = _ENV.get('SECRET_KEY')
     if not SECRET_KEY:
         # FAIL_FAST_CONFIG: Ensure SECRET_KEY is set for security.
         raise ValueError("No SECRET_KEY set for Flask application. Did you forget to set it in .env?")
 
     # DOTENV_SECURITY: DATABASE_URL is treated as a secret/sensitive configuration.
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///blackjack.db'
+    SQLALCHEMY_DATABASE_URI = _ENV.get('DATABASE_URL') or 'sqlite:///blackjack.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False # Recommended to disable to save resources.
 
+    # Connection pool tuning for concurrent SocketIO load.
+    # A good starting point for DB_POOL_SIZE is (cores * 2) + effective_spindles.
+    # pool_pre_ping discards dead connections; pool_recycle avoids server-side timeouts.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(_ENV.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(_ENV.get('DB_MAX_OVERFLOW', 40)),
+        'pool_pre_ping': True,
+        'pool_recycle': 3600,
+        'pool_timeout': 30,
+    }
+
     # REDIS_URL for scalable session management
     # Defaults to a standard local Redis instance.
-    REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
+    REDIS_URL = _ENV.get('REDIS_URL') or 'redis://localhost:6379/0'
+    # Upper bound on pooled Redis connections shared by all handlers.
+    # When every connection is busy, callers wait up to REDIS_POOL_TIMEOUT seconds.
+    REDIS_MAX_CONNECTIONS = int(_ENV.get('REDIS_MAX_CONN', 64))
+    REDIS_POOL_TIMEOUT = int(_ENV.get('REDIS_POOL_TIMEOUT', 5))
+
+    # Async framework for SocketIO ('gevent' or 'eventlet').
+    # gevent (with gevent-websocket) avoids eventlet's latency on HTTP routes.
+    SOCKETIO_ASYNC_MODE = _ENV.get('SOCKETIO_ASYNC_MODE', 'gevent')
+    # Optional message queue URL (e.g. the Redis URL) for multi-worker SocketIO deployments.
+    SOCKETIO_MESSAGE_QUEUE = _ENV.get('SOCKETIO_MESSAGE_QUEUE')
     
-    FLASK_ENV = os.environ.get('FLASK_ENV', 'development')
+    FLASK_ENV = _FLASK_ENV
 
     # Basic logging configuration for safety_first rule.
-    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    LOG_LEVEL = _ENV.get('LOG_LEVEL', 'INFO').upper()
+
+    # Port for the development server started by wsgi.py.
+    PORT = int(_ENV.get('PORT', 5000))
 
 
 class DevelopmentConfig(Config):
@@ -42,6 +75,8 @@ class DevelopmentConfig(Config):
     Development-specific configuration.
     """
     DEBUG = True # Use DEBUG only in development.
+    # Create missing tables on startup for a zero-setup local database.
+    INIT_DB = _ENV.get('FLASK_INIT_DB', '1') == '1'
 
 
 class ProductionConfig(Config):
@@ -50,15 +85,19 @@ class ProductionConfig(Config):
     Ensures debug is off and uses robust database configuration.
     """
     DEBUG = False # PRODUCTION_SECURITY: Never hardcode debug=True.
+    # Workers never touch the schema; run `flask init-db` (or migrations) once per deploy.
+    INIT_DB = _ENV.get('FLASK_INIT_DB') == '1'
     # In a real production app, DATABASE_URL and REDIS_URL must be set
     # in the production environment.
 
 
+@lru_cache(maxsize=None)
 def get_config():
     """
     Dynamically retrieves the appropriate configuration class based on FLASK_ENV.
+    The result is memoized, so repeated calls return the same class.
     """
-    env = os.environ.get('FLASK_ENV', 'development')
+    env = _FLASK_ENV
     if env == 'production':
         return ProductionConfig
     elif env == 'development':
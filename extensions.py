@@ -7,7 +7,7 @@ a single, importable source for these objects.
 """
 from flask_sqlalchemy import SQLAlchemy
 from flask_socketio import SocketIO
-from redis import Redis
+from redis import BlockingConnectionPool, Redis
 from config import CurrentConfig
 import logging
 
@@ -17,14 +17,35 @@ logger = logging.getLogger(__name__)
 db = SQLAlchemy()
 
 # Initialize SocketIO without an app
-socketio = SocketIO(cors_allowed_origins="*", async_mode='eventlet')
+# async_handlers lets concurrent events run in their own greenlets.
+# message_queue is passed to init_app in create_app: any 'message_queue'
+# keyword here builds a server at import time, which init_app then replaces,
+# dropping every @socketio.on handler registered in between.
+socketio = SocketIO(
+    cors_allowed_origins="*",
+    async_mode=CurrentConfig.SOCKETIO_ASYNC_MODE,
+    async_handlers=True
+)
 
 # Initialize Redis client
 try:
-    # `decode_responses=True` is crucial for working with JSON strings
-    redis_client = Redis.from_url(CurrentConfig.REDIS_URL, decode_responses=True)
+    # A single bounded pool is shared by every module that imports `redis_client`.
+    # BlockingConnectionPool waits for a free connection under bursts instead of raising.
+    # Responses are left as raw bytes; game state is stored as MessagePack bytes.
+    # The client deliberately keeps the pool rather than single_connection_client=True:
+    # a module-level client is shared by all greenlets, so one sticky connection would
+    # serialize every Redis call behind its lock. Pool checkout is a cheap deque op.
+    redis_pool = BlockingConnectionPool.from_url(
+        CurrentConfig.REDIS_URL,
+        decode_responses=False,
+        max_connections=CurrentConfig.REDIS_MAX_CONNECTIONS,
+        timeout=CurrentConfig.REDIS_POOL_TIMEOUT,
+        health_check_interval=30,
+        socket_keepalive=True
+    )
+    redis_client = Redis(connection_pool=redis_pool)
     redis_client.ping()
     logger.info("Redis client connected successfully.")
 except Exception as e:
     logger.error(f"Failed to connect to Redis at {CurrentConfig.REDIS_URL}: {e}")
-    redis_client = None
\ No newline at end of file
+    redis_client = None
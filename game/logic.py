@@ -4,16 +4,28 @@ Core BlackJack game logic and components.
 This module encapsulates all the rules, components (Card, Deck, Player, AIPlayer),
 and state management (`GameSession`) for a BlackJack game. 
 
-It is designed to be fully serializable to/from JSON to support
-a stateless, Redis-backed architecture.
+It is designed to be fully serializable (via the msgspec `*State` structs)
+to support a stateless, Redis-backed architecture.
 """
 import random
 import logging
-from enum import Enum
+from enum import Enum, IntEnum
+import msgspec
 
 logger = logging.getLogger(__name__)
 
-class DIFFICULTY(Enum):
+_SUITS = ('Hearts', 'Diamonds', 'Clubs', 'Spades')
+_SUIT_INDEX = {suit: i for i, suit in enumerate(_SUITS)}
+
+# Ranks are stored as ints: 2-10 are pip cards, then Jack=11, Queen=12, King=13, Ace=14.
+ACE = 14
+_RANKS = tuple(range(2, ACE + 1))
+
+# Display names sent to the client (converted only at the edge).
+_RANK_NAME = {rank: str(rank) for rank in range(2, 11)}
+_RANK_NAME.update({11: 'Jack', 12: 'Queen', 13: 'King', ACE: 'Ace'})
+
+class DIFFICULTY(IntEnum):
     EASY = 1
     MEDIUM = 2
     HARD = 3
@@ -28,43 +40,73 @@ class GamePhase(Enum):
     GAME_OVER = "game_over"
 
 
+# --- Serialized state ---
+# msgspec encodes/decodes these structs directly, with no intermediate dict.
+# `array_like=True` packs fields positionally, so payloads carry no key names.
+# Cards are stored by `Card.card_id`.
+
+class PlayerState(msgspec.Struct, array_like=True):
+    name: str
+    hand: list[int]
+    is_dealer: bool = False
+
+class HumanPlayerState(msgspec.Struct, array_like=True):
+    name: str
+    hand: list[int]
+    balance: int
+    current_bet: int
+
+class AIPlayerState(msgspec.Struct, array_like=True):
+    name: str
+    hand: list[int]
+    difficulty: DIFFICULTY
+
+class DeckState(msgspec.Struct, array_like=True):
+    cards: list[int]
+
+class GameSessionState(msgspec.Struct, array_like=True):
+    session_id: str
+    player: HumanPlayerState
+    ai_player: AIPlayerState
+    dealer: PlayerState
+    deck: DeckState
+    phase: GamePhase
+    difficulty: DIFFICULTY
+    last_round_winner: str
+    user_id: int | None = None
+    balance_dirty: bool = False
+    rounds_played: int = 0
+    last_emitted_hash: int = 0
+
+
 class Card:
     """
-    Represents a single playing card. Fully JSON serializable.
+    Represents a single playing card.
+
+    Cards are immutable, so the 52 distinct instances are shared (see
+    `_ALL_CARDS`) and serialized for Redis by their integer `card_id`.
+    `to_dict` is only used for the client view.
     """
-    def __init__(self, suit: str, rank: str):
+    __slots__ = ('suit', 'rank', 'value', 'card_id')
+
+    def __init__(self, suit: str, rank: int):
         self.suit = suit
         self.rank = rank
-        self.value = self._get_value(rank)
-
-    def _get_value(self, rank: str) -> int:
-        if rank in ['Jack', 'Queen', 'King']:
-            return 10
-        elif rank == 'Ace':
-            return 11
-        else:
-            return int(rank)
+        # Face cards count 10; Aces count 11 until adjusted in get_score.
+        self.value = min(rank, 10) if rank < ACE else 11
+        self.card_id = _SUIT_INDEX[suit] * len(_RANKS) + rank - 2
 
     def to_dict(self) -> dict:
-        return {'suit': self.suit, 'rank': self.rank}
-
-    @classmethod
-    def from_dict(cls, data: dict):
-        if not data:
-            return None
-        return cls(data['suit'], data['rank'])
+        return {'suit': self.suit, 'rank': _RANK_NAME[self.rank]}
 
     def __repr__(self) -> str:
-        return f"{self.rank} of {self.suit}"
+        return f"{_RANK_NAME[self.rank]} of {self.suit}"
 
 
 class Deck:
     """
-    Represents a deck of 52 playing cards. Fully JSON serializable.
+    Represents a deck of 52 playing cards. Stored as a `DeckState` struct of card IDs.
     """
-    SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-    RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
-
     def __init__(self, create_new=True):
         self.cards: list[Card] = []
         if create_new:
@@ -72,53 +114,82 @@ class Deck:
             self.shuffle()
 
     def _create_deck(self) -> list[Card]:
-        return [Card(suit, rank) for suit in self.SUITS for rank in self.RANKS]
+        return list(_ALL_CARDS)
 
     def shuffle(self):
+        # Reshuffles are already logged by the GameSession that requests them.
         random.shuffle(self.cards)
-        logger.info("Deck shuffled.")
 
     def deal_card(self) -> Card:
         if not self.cards:
             logger.error("Attempted to deal from an empty deck.")
             raise IndexError("Deck is empty!")
         card = self.cards.pop()
-        logger.debug(f"Dealt card: {card}")
+        logger.debug("Dealt card: %s", card)
         return card
 
+    def deal_cards(self, count: int) -> list[Card]:
+        """
+        Deals `count` cards at once, in the same order repeated `deal_card` calls would.
+        """
+        if count <= 0:
+            raise ValueError(f"Cannot deal {count} cards.")
+        if count > len(self.cards):
+            logger.error("Attempted to deal %s cards from a deck of %s.", count, len(self.cards))
+            raise IndexError("Deck is empty!")
+        start = len(self.cards) - count
+        cards = self.cards[start:][::-1]
+        del self.cards[start:]
+        logger.debug("Dealt cards: %s", cards)
+        return cards
+
     def remaining_cards(self) -> int:
         return len(self.cards)
 
-    def to_dict(self) -> dict:
-        # Serialize the *entire* deck state, including remaining cards
-        return {'cards': [card.to_dict() for card in self.cards]}
+    def to_struct(self) -> DeckState:
+        # Serialize the *entire* deck state, including remaining cards,
+        # as a compact list of card IDs.
+        return DeckState([card.card_id for card in self.cards])
 
     @classmethod
-    def from_dict(cls, data: dict):
+    def from_struct(cls, state: DeckState):
         deck = cls(create_new=False) # Create an empty deck
-        deck.cards = [Card.from_dict(c_data) for c_data in data['cards']]
+        deck.cards = list(map(_ALL_CARDS.__getitem__, state.cards))
         return deck
 
 
+# Shared, immutable card instances indexed by `Card.card_id`.
+_ALL_CARDS = tuple(Card(suit, rank) for suit in _SUITS for rank in _RANKS)
+
+
 class Player:
     """
-    Base class for a Blackjack player. Fully JSON serializable.
+    Base class for a Blackjack player. Stored as a `PlayerState` struct.
     """
     def __init__(self, name: str, is_dealer: bool = False):
         self.name = name
         self.hand: list[Card] = []
         self.is_dealer = is_dealer
+        self._score_cache: int | None = None # Invalidated whenever the hand changes
 
     def add_card(self, card: Card):
         self.hand.append(card)
-        logger.debug(f"{self.name} received {card}.")
+        self._score_cache = None
+        logger.debug("%s received %s.", self.name, card)
 
     def get_score(self) -> int:
-        score = sum(card.value for card in self.hand)
-        num_aces = sum(1 for card in self.hand if card.rank == 'Ace')
+        if self._score_cache is not None:
+            return self._score_cache
+        score = 0
+        num_aces = 0
+        for card in self.hand:
+            score += card.value
+            if card.rank == ACE:
+                num_aces += 1
         while score > 21 and num_aces > 0:
             score -= 10
             num_aces -= 1
+        self._score_cache = score
         return score
 
     def is_bust(self) -> bool:
@@ -129,6 +200,7 @@ class Player:
 
     def clear_hand(self):
         self.hand = []
+        self._score_cache = None
 
     def get_hand_display(self, hide_first_card: bool = False) -> list[dict]:
         if hide_first_card and self.is_dealer and len(self.hand) > 0:
@@ -140,44 +212,44 @@ class Player:
         Generates a dictionary for the *client state* (get_game_state).
         This hides information as needed.
         """
-        score = self.get_score()
         hand_display = self.get_hand_display(hide_dealer_first_card)
-        
-        if hide_dealer_first_card and self.is_dealer and len(self.hand) > 1:
-            # Show only the value of the up-card
-            score = self.hand[1].value
-        elif hide_dealer_first_card and self.is_dealer:
-            score = 0
 
+        if hide_dealer_first_card and self.is_dealer:
+            # Show only the value of the up-card; the full hand is not scored
+            # so nothing about the hole card is revealed.
+            return {
+                'name': self.name,
+                'hand': hand_display,
+                'score': self.hand[1].value if len(self.hand) > 1 else 0,
+                'is_bust': False,
+                'is_blackjack': False
+            }
+
+        score = self.get_score()
         return {
             'name': self.name,
             'hand': hand_display,
             'score': score,
-            'is_bust': self.is_bust(),
-            'is_blackjack': self.is_blackjack()
+            'is_bust': score > 21,
+            'is_blackjack': len(self.hand) == 2 and score == 21
         }
 
-    def to_dict(self) -> dict:
+    def to_struct(self) -> PlayerState:
         """
         Serializes the *full* object state for Redis.
         """
-        return {
-            'name': self.name,
-            'hand': [card.to_dict() for card in self.hand],
-            'is_dealer': self.is_dealer,
-            # Subclasses will add their own data
-        }
+        return PlayerState(self.name, [card.card_id for card in self.hand], self.is_dealer)
 
     @classmethod
-    def from_dict(cls, data: dict):
-        player = cls(data['name'], data.get('is_dealer', False))
-        player.hand = [Card.from_dict(c_data) for c_data in data['hand']]
+    def from_struct(cls, state: PlayerState):
+        player = cls(state.name, state.is_dealer)
+        player.hand = list(map(_ALL_CARDS.__getitem__, state.hand))
         return player
 
 
 class HumanPlayer(Player):
     """
-    Represents the human player. Fully JSON serializable.
+    Represents the human player. Stored as a `HumanPlayerState` struct.
     """
     def __init__(self, name: str, initial_balance: int = 1000):
         super().__init__(name, is_dealer=False)
@@ -186,26 +258,26 @@ class HumanPlayer(Player):
 
     def place_bet(self, amount: int) -> bool:
         if amount <= 0 or amount > self.balance:
-            logger.warning(f"Invalid bet amount {amount} for {self.name} with balance {self.balance}")
+            logger.warning("Invalid bet amount %s for %s with balance %s", amount, self.name, self.balance)
             return False
         self.current_bet = amount
         self.balance -= amount
-        logger.info(f"{self.name} placed a bet of {amount}. New balance: {self.balance}")
+        logger.info("%s placed a bet of %s. New balance: %s", self.name, amount, self.balance)
         return True
 
     def win_bet(self, multiplier: float = 2.0):
         winnings = int(self.current_bet * multiplier)
         self.balance += winnings
-        logger.info(f"{self.name} won {winnings}. New balance: {self.balance}")
+        logger.info("%s won %s. New balance: %s", self.name, winnings, self.balance)
         self.current_bet = 0
 
     def lose_bet(self):
-        logger.info(f"{self.name} lost their bet of {self.current_bet}. Current balance: {self.balance}")
+        logger.info("%s lost their bet of %s. Current balance: %s", self.name, self.current_bet, self.balance)
         self.current_bet = 0
 
     def push_bet(self):
         self.balance += self.current_bet
-        logger.info(f"{self.name} pushed. Bet {self.current_bet} returned. New balance: {self.balance}")
+        logger.info("%s pushed. Bet %s returned. New balance: %s", self.name, self.current_bet, self.balance)
         self.current_bet = 0
 
     def to_dict_for_state(self, hide_dealer_first_card: bool = False) -> dict:
@@ -217,85 +289,97 @@ class HumanPlayer(Player):
         player_data['current_bet'] = self.current_bet
         return player_data
 
-    def to_dict(self) -> dict:
+    def to_struct(self) -> HumanPlayerState:
         """
         Serializes the *full* object state for Redis.
         """
-        data = super().to_dict()
-        data.update({
-            'balance': self.balance,
-            'current_bet': self.current_bet
-        })
-        return data
+        return HumanPlayerState(
+            self.name, [card.card_id for card in self.hand], self.balance, self.current_bet
+        )
 
     @classmethod
-    def from_dict(cls, data: dict):
-        player = super().from_dict(data) # This will be HumanPlayer(name, is_dealer)
-        player.balance = data['balance']
-        player.current_bet = data['current_bet']
+    def from_struct(cls, state: HumanPlayerState):
+        player = cls(state.name, state.balance)
+        player.hand = list(map(_ALL_CARDS.__getitem__, state.hand))
+        player.current_bet = state.current_bet
         return player
 
 
+def _easy_strategy(player_score: int, dealer_value: int) -> str:
+    if player_score < 17:
+        return 'hit'
+    else:
+        return 'stand'
+
+
+def _medium_strategy(player_score: int, dealer_value: int) -> str:
+    if player_score < 12: return 'hit'
+    if player_score >= 17: return 'stand'
+    if 12 <= player_score <= 16:
+        if dealer_value >= 7 or dealer_value == 11: return 'hit'
+        else: return 'stand'
+    return 'stand'
+
+
+def _hard_strategy(player_score: int, dealer_value: int) -> str:
+    if player_score <= 11: return 'hit'
+    if player_score == 12:
+        if 4 <= dealer_value <= 6: return 'stand'
+        else: return 'hit'
+    if 13 <= player_score <= 16:
+        if 2 <= dealer_value <= 6: return 'stand'
+        else: return 'hit'
+    if player_score >= 17: return 'stand'
+    return 'stand'
+
+
+# AI strategy per difficulty.
+_DECISION_TABLE = {
+    DIFFICULTY.EASY: _easy_strategy,
+    DIFFICULTY.MEDIUM: _medium_strategy,
+    DIFFICULTY.HARD: _hard_strategy,
+}
+
+# The whole decision space is tiny, so every action is precomputed once:
+# (difficulty, player_score 0-21, dealer up-card value 2-11) -> action.
+# Scores above 21 are clamped to 21, where every strategy stands.
+_AI_STRATEGY = {
+    (difficulty, player_score, dealer_value): strategy(player_score, dealer_value)
+    for difficulty, strategy in _DECISION_TABLE.items()
+    for player_score in range(22)
+    for dealer_value in range(2, 12)
+}
+
+
 class AIPlayer(Player):
     """
-    Represents an AI player. Fully JSON serializable.
+    Represents an AI player. Stored as an `AIPlayerState` struct.
     """
     def __init__(self, name: str, difficulty: DIFFICULTY = DIFFICULTY.MEDIUM):
         super().__init__(name, is_dealer=False)
         self.difficulty = difficulty
 
     def decide_action(self, dealer_up_card: Card) -> str:
-        player_score = self.get_score()
-        dealer_value = dealer_up_card.value
+        return _AI_STRATEGY[(self.difficulty, min(self.get_score(), 21), dealer_up_card.value)]
 
-        if self.difficulty == DIFFICULTY.EASY:
-            if player_score < 17:
-                return 'hit'
-            else:
-                return 'stand'
-        
-        elif self.difficulty == DIFFICULTY.MEDIUM:
-            if player_score < 12: return 'hit'
-            if player_score >= 17: return 'stand'
-            if 12 <= player_score <= 16:
-                if dealer_value >= 7 or dealer_value == 11: return 'hit'
-                else: return 'stand'
-            return 'stand'
-
-        elif self.difficulty == DIFFICULTY.HARD:
-            if player_score <= 11: return 'hit'
-            if player_score == 12:
-                if 4 <= dealer_value <= 6: return 'stand'
-                else: return 'hit'
-            if 13 <= player_score <= 16:
-                if 2 <= dealer_value <= 6: return 'stand'
-                else: return 'hit'
-            if player_score >= 17: return 'stand'
-            return 'stand'
-        
-        return 'stand'
-
-    def to_dict(self) -> dict:
+    def to_struct(self) -> AIPlayerState:
         """
         Serializes the *full* object state for Redis.
         """
-        data = super().to_dict()
-        data.update({
-            'difficulty': self.difficulty.name
-        })
-        return data
+        return AIPlayerState(self.name, [card.card_id for card in self.hand], self.difficulty)
 
     @classmethod
-    def from_dict(cls, data: dict):
-        player = super().from_dict(data) # This will be AIPlayer(name, is_dealer)
-        player.difficulty = DIFFICULTY[data['difficulty']]
+    def from_struct(cls, state: AIPlayerState):
+        player = cls(state.name, state.difficulty)
+        player.hand = list(map(_ALL_CARDS.__getitem__, state.hand))
         return player
 
 
 class GameSession:
     """
     Manages the state and flow of a single BlackJack game for a specific user session.
-    Fully JSON serializable.
+    Persisted through the msgspec `GameSessionState` struct (`to_struct`/`from_struct`);
+    `get_game_state` builds the separate client-facing view.
     """
     def __init__(self, session_id: str, difficulty: DIFFICULTY, initial_balance: int = 1000):
         self.session_id = session_id
@@ -306,7 +390,11 @@ class GameSession:
         self.phase = GamePhase.WAITING_FOR_BET
         self.difficulty = difficulty
         self.last_round_winner: str = "None"
-        logger.info(f"Game session {session_id} initialized for difficulty {difficulty.name}.")
+        self.user_id: int | None = None # Primary key of the persistent User, cached by routes
+        self.balance_dirty = False # Balance changed since it was last persisted to the DB
+        self.rounds_played = 0
+        self.last_emitted_hash = 0 # Digest of the last game_state_update payload, set by routes
+        logger.info("Game session %s initialized for difficulty %s.", session_id, difficulty.name)
 
     def get_game_state(self, hide_dealer_first_card: bool = True) -> dict:
         """
@@ -334,6 +422,7 @@ class GameSession:
             raise ValueError("Game Over. Player has no money.")
         if not self.player.place_bet(bet_amount):
             raise ValueError(f"Invalid bet amount {bet_amount} or insufficient funds.")
+        self.balance_dirty = True
         
         self.player.clear_hand()
         self.ai_player.clear_hand()
@@ -345,17 +434,19 @@ class GameSession:
             logger.info("Deck was low, new deck created and shuffled.")
 
         self.phase = GamePhase.DEALING
-        logger.info(f"Round started for {self.session_id} with bet {bet_amount}.")
+        logger.info("Round started for %s with bet %s.", self.session_id, bet_amount)
         
         try:
-            self.player.add_card(self.deck.deal_card())
-            self.ai_player.add_card(self.deck.deal_card())
-            self.dealer.add_card(self.deck.deal_card())
-            self.player.add_card(self.deck.deal_card())
-            self.ai_player.add_card(self.deck.deal_card())
-            self.dealer.add_card(self.deck.deal_card())
+            # Deal two rounds of player -> AI -> dealer in one batch.
+            cards = self.deck.deal_cards(6)
+            self.player.add_card(cards[0])
+            self.ai_player.add_card(cards[1])
+            self.dealer.add_card(cards[2])
+            self.player.add_card(cards[3])
+            self.ai_player.add_card(cards[4])
+            self.dealer.add_card(cards[5])
         except IndexError as e:
-            logger.error(f"Deck ran out during initial deal: {e}")
+            logger.error("Deck ran out during initial deal: %s", e)
             self.deck = Deck() # Failsafe: reset deck
             raise ValueError("Deck error. Round reset.")
 
@@ -368,7 +459,7 @@ class GameSession:
         else:
             self.phase = GamePhase.PLAYER_TURN
         
-        logger.info(f"Initial deal complete. Current phase: {self.phase.value}")
+        logger.info("Initial deal complete. Current phase: %s", self.phase.value)
         # No return value, state is saved in routes
     
     def player_hit(self):
@@ -376,7 +467,7 @@ class GameSession:
             raise ValueError("Not player's turn to hit.")
 
         self.player.add_card(self.deck.deal_card())
-        logger.info(f"{self.player.name} hit. Score: {self.player.get_score()}")
+        logger.info("%s hit. Score: %s", self.player.name, self.player.get_score())
 
         if self.player.is_bust() or self.player.get_score() == 21:
             self.phase = GamePhase.AI_TURN
@@ -385,7 +476,7 @@ class GameSession:
         if self.phase != GamePhase.PLAYER_TURN:
             raise ValueError("Not player's turn to stand.")
         
-        logger.info(f"{self.player.name} stood. Score: {self.player.get_score()}.")
+        logger.info("%s stood. Score: %s.", self.player.name, self.player.get_score())
         self.phase = GamePhase.AI_TURN
     
     def play_ai_turn(self):
@@ -397,15 +488,17 @@ class GameSession:
             logger.info("Player busted, skipping AI turn.")
             return
 
-        while not self.ai_player.is_bust() and self.ai_player.get_score() < 21:
-            dealer_up_card = self.dealer.hand[1]
+        dealer_up_card = self.dealer.hand[1]
+        score = self.ai_player.get_score()
+        while score < 21: # A score above 21 is a bust
             action = self.ai_player.decide_action(dealer_up_card)
             
             if action == 'hit':
                 self.ai_player.add_card(self.deck.deal_card())
-                logger.info(f"{self.ai_player.name} hit. Score: {self.ai_player.get_score()}")
+                score = self.ai_player.get_score()
+                logger.info("%s hit. Score: %s", self.ai_player.name, score)
             else:
-                logger.info(f"{self.ai_player.name} stood. Score: {self.ai_player.get_score()}")
+                logger.info("%s stood. Score: %s", self.ai_player.name, score)
                 break
         
         self.phase = GamePhase.DEALER_TURN
@@ -418,9 +511,9 @@ class GameSession:
 
         while self.dealer.get_score() < 17:
             self.dealer.add_card(self.deck.deal_card())
-            logger.info(f"Dealer hit. Score: {self.dealer.get_score()}")
+            logger.info("Dealer hit. Score: %s", self.dealer.get_score())
         
-        logger.info(f"Dealer stood/busted. Final score: {self.dealer.get_score()}")
+        logger.info("Dealer stood/busted. Final score: %s", self.dealer.get_score())
         self.phase = GamePhase.ROUND_END
         self._determine_winner()
 
@@ -466,57 +559,75 @@ class GameSession:
         else:
             self.last_round_winner = "Push"
             
-        logger.info(f"Round result for {self.player.name}: {player_result}. New balance: {self.player.balance}")
+        self.balance_dirty = True
+        self.rounds_played += 1
+        logger.info("Round result for %s: %s. New balance: %s", self.player.name, player_result, self.player.balance)
 
         if self.player.balance <= 0:
             self.phase = GamePhase.GAME_OVER
-            logger.info(f"Player {self.player.name} ran out of money. Game Over.")
+            logger.info("Player %s ran out of money. Game Over.", self.player.name)
     
     def reset_game(self, initial_balance: int = 1000):
         """
         Resets the entire game session, restoring initial balance and getting a new deck.
+        Existing players and deck are reset in place rather than reallocated.
         """
-        self.player = HumanPlayer("Player", initial_balance)
-        self.ai_player = AIPlayer("AI Player", self.difficulty)
-        self.dealer = Player("Dealer", is_dealer=True)
-        self.deck = Deck()
+        self.player.balance = initial_balance
+        self.player.current_bet = 0
+        self.balance_dirty = True
+        self.rounds_played = 0
+        self.player.clear_hand()
+        self.ai_player.clear_hand()
+        self.dealer.clear_hand()
+        self.deck.cards = self.deck._create_deck()
+        self.deck.shuffle()
         self.phase = GamePhase.WAITING_FOR_BET
         self.last_round_winner = "None"
-        logger.info(f"Game session {self.session_id} reset.")
+        logger.info("Game session %s reset.", self.session_id)
 
-    def to_dict(self) -> dict:
+    def to_struct(self) -> GameSessionState:
         """
         Serializes the *entire* game session for storage in Redis.
         """
-        return {
-            'session_id': self.session_id,
-            'player': self.player.to_dict(),
-            'ai_player': self.ai_player.to_dict(),
-            'dealer': self.dealer.to_dict(),
-            'deck': self.deck.to_dict(),
-            'phase': self.phase.name, # Store enum by name
-            'difficulty': self.difficulty.name,
-            'last_round_winner': self.last_round_winner
-        }
+        return GameSessionState(
+            session_id=self.session_id,
+            player=self.player.to_struct(),
+            ai_player=self.ai_player.to_struct(),
+            dealer=self.dealer.to_struct(),
+            deck=self.deck.to_struct(),
+            phase=self.phase,
+            difficulty=self.difficulty,
+            last_round_winner=self.last_round_winner,
+            user_id=self.user_id,
+            balance_dirty=self.balance_dirty,
+            rounds_played=self.rounds_played,
+            last_emitted_hash=self.last_emitted_hash
+        )
 
     @classmethod
-    def from_dict(cls, data: dict):
+    def from_struct(cls, state: GameSessionState):
         """
-        Reconstructs a GameSession object from a dictionary (e.g., from Redis).
+        Reconstructs a GameSession object from its decoded state (e.g., from Redis).
         """
-        difficulty = DIFFICULTY[data['difficulty']]
-        session_id = data['session_id']
+        session_id = state.session_id
         
-        # Create an empty session
-        session = cls(session_id, difficulty, 1000) 
+        # Bypass __init__: it would build players and shuffle a full deck
+        # only for every component to be overwritten below.
+        session = cls.__new__(cls)
+        session.session_id = session_id
+        session.difficulty = state.difficulty
         
-        # Overwrite the components with the loaded data
-        session.player = HumanPlayer.from_dict(data['player'])
-        session.ai_player = AIPlayer.from_dict(data['ai_player'])
-        session.dealer = Player.from_dict(data['dealer'])
-        session.deck = Deck.from_dict(data['deck'])
-        session.phase = GamePhase[data['phase']]
-        session.last_round_winner = data['last_round_winner']
+        # Restore the components from the loaded data
+        session.player = HumanPlayer.from_struct(state.player)
+        session.ai_player = AIPlayer.from_struct(state.ai_player)
+        session.dealer = Player.from_struct(state.dealer)
+        session.deck = Deck.from_struct(state.deck)
+        session.phase = state.phase
+        session.last_round_winner = state.last_round_winner
+        session.user_id = state.user_id
+        session.balance_dirty = state.balance_dirty
+        session.rounds_played = state.rounds_played
+        session.last_emitted_hash = state.last_emitted_hash
         
-        logger.debug(f"Game session {session_id} reconstructed from Redis.")
+        logger.debug("Game session %s reconstructed from Redis.", session_id)
         return session
\ No newline at end of file
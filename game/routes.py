@@ -5,13 +5,13 @@ This module defines the WebSocket event handlers for the BlackJack game.
 It interacts with the core game logic (`game/logic.py`) and uses Redis
 for scalable, persistent session management.
 """
-from flask import Blueprint, request, jsonify, render_template, current_app
+from flask import Blueprint, request, jsonify, render_template
 from flask_socketio import emit, join_room, leave_room, disconnect
 import logging
-import json
-import eventlet
+from hashlib import blake2b
+import msgspec
 
-from .logic import GameSession, DIFFICULTY, GamePhase
+from .logic import GameSession, GameSessionState, DIFFICULTY, GamePhase
 from extensions import socketio, db, redis_client
 from models import User
 from utils import get_session_id_from_request
@@ -25,39 +25,118 @@ game_bp = Blueprint(
     static_folder='../static'
 )
 
+# The application this blueprint is registered on, captured once so event
+# handlers and background tasks don't resolve `current_app` per event.
+_APP = None
+
+@game_bp.record_once
+def _capture_app(state):
+    global _APP
+    _APP = state.app
+
 # --- Redis Session Helpers ---
 REDIS_GAME_KEY_PREFIX = "blackjack:session:"
 REDIS_SESSION_TTL = 7200 
 
-def get_game_session(sid: str) -> GameSession | None:
+# Cosmetic pause the client waits before showing AI/dealer steps.
+REVEAL_DELAY_MS = 1000
+
+# During play the balance lives only in the sid-keyed Redis session; it is
+# written to the DB on disconnect, on Game Over, and every
+# BALANCE_CHECKPOINT_ROUNDS rounds. Nothing reads an old sid's session back,
+# so the DB is the only durable copy:
+# - A client that reconnects on a new sid seeds its balance from the DB. Until
+#   the old socket's disconnect has been handled, that balance can be up to
+#   BALANCE_CHECKPOINT_ROUNDS - 1 rounds stale.
+# - If a worker dies without running the disconnect handler, up to
+#   BALANCE_CHECKPOINT_ROUNDS - 1 rounds of balance changes are lost.
+BALANCE_CHECKPOINT_ROUNDS = 5
+
+# Reusable MessagePack encoder/decoder for session payloads stored in Redis.
+# The typed decoder yields a GameSessionState directly, with no intermediate dict.
+_session_encoder = msgspec.msgpack.Encoder()
+_session_decoder = msgspec.msgpack.Decoder(GameSessionState)
+
+# game_state_update is sent to the client as a binary MessagePack frame.
+_state_encoder = msgspec.msgpack.Encoder()
+
+def get_game_session(sid: str, touch: bool = False) -> GameSession | None:
+    """
+    Loads the session for `sid` from Redis.
+    Paths that save the session afterwards get their TTL refreshed by the
+    SET; read-only paths pass `touch=True` to also refresh it here.
+    """
     if not redis_client:
         logger.error("Redis client is not available.")
         return None
     
     key = f"{REDIS_GAME_KEY_PREFIX}{sid}"
     try:
-        session_data_json = redis_client.get(key)
-        if session_data_json:
-            session_data = json.loads(session_data_json)
-            redis_client.expire(key, REDIS_SESSION_TTL)
-            return GameSession.from_dict(session_data)
+        if touch:
+            # Batch GET + EXPIRE into one round-trip (no MULTI/EXEC needed).
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.expire(key, REDIS_SESSION_TTL)
+            session_payload, _ = pipe.execute()
+        else:
+            session_payload = redis_client.get(key)
+        if session_payload:
+            return GameSession.from_struct(_session_decoder.decode(session_payload))
     except Exception as e:
         logger.exception(f"Failed to retrieve or deserialize session {sid} from Redis: {e}")
     return None
 
 def save_game_session(game_session: GameSession):
+    """
+    Writes `game_session` with a plain SET (refreshing its TTL).
+    Handlers load, mutate and save without locking, so the last write wins
+    if two events for the same client interleave.
+    """
     if not redis_client:
         logger.error("Redis client is not available.")
         return
 
     key = f"{REDIS_GAME_KEY_PREFIX}{game_session.session_id}"
     try:
-        session_data = game_session.to_dict()
-        session_data_json = json.dumps(session_data)
-        redis_client.set(key, session_data_json, ex=REDIS_SESSION_TTL)
+        session_payload = _session_encoder.encode(game_session.to_struct())
+        redis_client.set(key, session_payload, ex=REDIS_SESSION_TTL)
     except Exception as e:
         logger.exception(f"Failed to serialize or save session {game_session.session_id} to Redis: {e}")
 
+def _get_session_user(game_session: GameSession | None, create: bool = False) -> User | None:
+    """
+    Returns the persistent User behind `game_session`.
+    The user's primary key is cached on the session, so this is a
+    primary-key lookup (served from the identity map when already loaded)
+    instead of a username query. With `create=True`, falls back to
+    `User.get_or_create` when the session has no cached user.
+    """
+    if game_session and game_session.user_id is not None:
+        user = db.session.get(User, game_session.user_id)
+        if user or not create:
+            return user
+    return User.get_or_create(username="Player") if create else None
+
+def _persist_balance(game_session: GameSession) -> bool:
+    """
+    Writes the session's balance to the DB if it changed since the last write.
+    Returns True if the DB balance is up to date. On failure the session
+    stays dirty, so the next checkpoint retries.
+    """
+    if not game_session.balance_dirty:
+        return True
+    try:
+        user = _get_session_user(game_session)
+        if not user:
+            logger.error(f"Cannot persist balance for {game_session.session_id}: no user for id {game_session.user_id}")
+            return False
+        user.update_balance(game_session.player.balance)
+    except Exception:
+        logger.exception(f"Failed to persist balance for {game_session.session_id}")
+        return False
+    game_session.balance_dirty = False
+    return True
+
 def delete_game_session(sid: str):
     if not redis_client:
         return
@@ -84,14 +163,15 @@ def connect():
     join_room(sid)
     logger.info(f"Client connected: {sid}. Joined room {sid}")
     
-    game_session = get_game_session(sid)
+    game_session = get_game_session(sid, touch=True)
     if game_session:
         logger.info(f"Resuming existing game session for {sid}.")
         hide_card = game_session.phase not in [GamePhase.ROUND_END, GamePhase.GAME_OVER]
-        _send_game_state(sid, hide_card)
+        # A (re)connected client has no state yet, so always send it.
+        _send_game_state(sid, game_session, hide_card, force=True)
     else:
         logger.info(f"No existing session found for {sid}. Awaiting start_game.")
-        socketio.emit('awaiting_start', {'message': 'Please start a new game.'})
+        _emit_to_client(sid, 'awaiting_start', {'message': 'Please start a new game.'})
 
 
 @socketio.on('disconnect')
@@ -102,30 +182,78 @@ def disconnect_handler():
 
     game_session = get_game_session(sid)
     if game_session:
-        try:
-            app = current_app._get_current_object()
-            with app.app_context():
-                user = User.query.filter_by(username="Player").first()
-                if user:
-                    user.update_balance(game_session.player.balance)
-                logger.info(f"Client {sid} disconnected. Final balance {game_session.player.balance} persisted to DB.")
-        except Exception as e:
-            logger.error(f"Failed to persist balance for {sid} on disconnect: {e}")
+        # SocketIO handlers already run inside the app context.
+        if _persist_balance(game_session):
+            logger.info(f"Client {sid} disconnected. Final balance {game_session.player.balance} persisted to DB.")
     else:
         logger.info(f"Client disconnected: {sid}. No active game session found.")
     
     leave_room(sid)
 
 
-def _send_game_state(sid: str, hide_dealer_first_card: bool = True):
-    game_session = get_game_session(sid)
-    if game_session:
-        state = game_session.get_game_state(hide_dealer_first_card)
-        socketio.emit('game_state_update', state, room=sid)
-        logger.debug(f"Emitted game_state_update to {sid} for phase {state['phase']}")
-    else:
-        logger.warning(f"Attempted to send state to non-existent session: {sid}")
-        emit('error', {'message': 'Game session not found. Please restart.'}, room=sid)
+def _emit_to_client(sid: str, event: str, data):
+    """
+    Emits `event` to the single client `sid` from a handler or a background task.
+
+    The client is always connected to this worker (handlers, and the tasks
+    they spawn, run where the socket lives), so `ignore_queue=True` delivers
+    directly instead of round-tripping through SOCKETIO_MESSAGE_QUEUE when
+    one is configured. Broadcasts to clients on other workers must not use this.
+    """
+    socketio.emit(event, data, to=sid, namespace='/', ignore_queue=True)
+
+
+def _encode_game_state(game_session: GameSession, hide_dealer_first_card: bool = True,
+                       reveal_delay_ms: int = 0, force: bool = False) -> bytes | None:
+    """
+    Encodes the client-facing state of `game_session` and records its digest
+    in `game_session.last_emitted_hash`.
+    Returns None if the payload matches the last one emitted for this
+    session (unless `force`), so the caller can skip the emit. The digest is
+    persisted with the session, so encode *before* saving it.
+    `reveal_delay_ms` tells the client how long to wait before rendering.
+    """
+    state = game_session.get_game_state(hide_dealer_first_card)
+    state['reveal_delay_ms'] = reveal_delay_ms
+    # Encode once; Socket.IO sends bytes as a binary attachment without re-encoding.
+    payload = _state_encoder.encode(state)
+    # blake2b rather than hash(): the digest is compared across workers and restarts.
+    digest = int.from_bytes(blake2b(payload, digest_size=8).digest(), 'big')
+    if digest == game_session.last_emitted_hash and not force:
+        return None
+    game_session.last_emitted_hash = digest
+    return payload
+
+def _emit_game_state(sid: str, game_session: GameSession, payload: bytes | None):
+    """Emits a payload from `_encode_game_state`; None means unchanged and is skipped."""
+    # Runs on every state change; don't build debug messages unless they will be logged.
+    if payload is None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Skipped unchanged game_state_update to {sid}")
+        return
+    _emit_to_client(sid, 'game_state_update', payload)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Emitted game_state_update to {sid} for phase {game_session.phase.value}")
+
+def _send_game_state(sid: str, game_session: GameSession, hide_dealer_first_card: bool = True,
+                     reveal_delay_ms: int = 0, force: bool = False):
+    """
+    Emits the client-facing state of the in-memory `game_session`.
+    Callers already hold the session they just loaded or saved, so it is
+    not re-fetched from Redis.
+    """
+    payload = _encode_game_state(game_session, hide_dealer_first_card, reveal_delay_ms, force)
+    _emit_game_state(sid, game_session, payload)
+
+def _save_and_send_game_state(sid: str, game_session: GameSession, hide_dealer_first_card: bool = True,
+                              reveal_delay_ms: int = 0):
+    """
+    Saves `game_session` and then emits its state, unless unchanged since the last emit.
+    Encoding first lets the new digest ride along in the same Redis SET.
+    """
+    payload = _encode_game_state(game_session, hide_dealer_first_card, reveal_delay_ms)
+    save_game_session(game_session)
+    _emit_game_state(sid, game_session, payload)
 
 
 @socketio.on('start_game')
@@ -151,22 +279,25 @@ def start_game_event(data: dict):
     game_session = get_game_session(sid)
     
     try:
-        user = User.get_or_create(username="Player")
-        initial_balance = user.balance
+        if not game_session or game_session.phase == GamePhase.GAME_OVER:
+            # The DB balance is only needed to seed a new session.
+            user = _get_session_user(game_session, create=True)
+            initial_balance = user.balance
 
-        if not game_session or game_session.phase in [GamePhase.ROUND_END, GamePhase.GAME_OVER]:
-            if game_session and game_session.phase == GamePhase.GAME_OVER:
+            if game_session:
                 logger.info(f"Player {sid} is starting a new game after Game Over.")
                 initial_balance = user.balance if user.balance > 0 else 1000
                 if initial_balance == 0: initial_balance = 1000 # Failsafe
                 
             game_session = GameSession(sid, difficulty, initial_balance=initial_balance)
+            game_session.user_id = user.id
+        elif game_session.phase == GamePhase.ROUND_END:
+            # Keep the session (and its unpersisted balance); apply the chosen difficulty.
+            game_session.difficulty = difficulty
+            game_session.ai_player.difficulty = difficulty
         
         game_session.start_round(bet_amount)
-        save_game_session(game_session)
-        user.update_balance(game_session.player.balance)
-
-        _send_game_state(sid, hide_dealer_first_card=True)
+        _save_and_send_game_state(sid, game_session, hide_dealer_first_card=True)
         logger.info(f"Game round started for {sid}.")
 
         # --- ★ バグ修正 ★ ---
@@ -177,8 +308,7 @@ def start_game_event(data: dict):
             game_session.phase != GamePhase.GAME_OVER):
             
             logger.info(f"Player turn skipped (e.g. Blackjack). Starting AI/Dealer turns.")
-            app = current_app._get_current_object()
-            eventlet.spawn(_play_ai_and_dealer_turns, sid, app)
+            socketio.start_background_task(_play_ai_and_dealer_turns, sid)
         # --- ★ 修正完了 ★ ---
 
     except (ValueError, IndexError) as e:
@@ -198,33 +328,29 @@ def player_action_event(data: dict):
         emit('error', {'message': 'No session ID found.'})
         return
 
-    game_session = get_game_session(sid)
-    if not game_session:
-        emit('error', {'message': 'No active game session. Please start a new game.'}, room=sid)
-        return
-    
-    if game_session.phase != GamePhase.PLAYER_TURN:
-        emit('error', {'message': 'It is not your turn to act.'}, room=sid)
-        return
-
     action = data.get('action')
     if action not in ['hit', 'stand']:
         emit('error', {'message': 'Invalid player action.'}, room=sid)
         return
 
     try:
+        game_session = get_game_session(sid)
+        if not game_session:
+            emit('error', {'message': 'No active game session. Please start a new game.'}, room=sid)
+            return
+        if game_session.phase != GamePhase.PLAYER_TURN:
+            raise ValueError('It is not your turn to act.')
+
         if action == 'hit':
             game_session.player_hit()
         elif action == 'stand':
             game_session.player_stand()
-        
-        save_game_session(game_session)
-        _send_game_state(sid, hide_dealer_first_card=True)
+
+        _save_and_send_game_state(sid, game_session, hide_dealer_first_card=True)
 
         # プレイヤーのターンが終了した場合 (Hitで21、Bust、またはStand)
         if game_session.phase != GamePhase.PLAYER_TURN:
-            app = current_app._get_current_object()
-            eventlet.spawn(_play_ai_and_dealer_turns, sid, app)
+            socketio.start_background_task(_play_ai_and_dealer_turns, sid)
 
     except (ValueError, IndexError) as e:
         logger.warning(f"Action '{action}' error for {sid}: {e}")
@@ -234,12 +360,13 @@ def player_action_event(data: dict):
         emit('error', {'message': 'An unexpected error occurred. Please try again.'}, room=sid)
 
 
-def _play_ai_and_dealer_turns(sid: str, app): 
+def _play_ai_and_dealer_turns(sid: str): 
     """
     Helper function to sequentially play AI and Dealer turns.
-    This *must* run within an app_context to use the database.
+    This *must* run within an app_context to use the database; one
+    context is pushed for the whole background task.
     """
-    with app.app_context():
+    with _APP.app_context():
         try:
             # --- AI Turn ---
             game_session = get_game_session(sid)
@@ -247,40 +374,40 @@ def _play_ai_and_dealer_turns(sid: str, app):
                 logger.warning(f"Skipping AI turn for {sid}, invalid phase.")
                 return
 
-            eventlet.sleep(1) # Small delay for UX
+            # The UX delay between steps is applied client-side (reveal_delay_ms).
             game_session.play_ai_turn()
-            save_game_session(game_session)
-            _send_game_state(sid, hide_dealer_first_card=True)
+            _save_and_send_game_state(sid, game_session, hide_dealer_first_card=True,
+                                      reveal_delay_ms=REVEAL_DELAY_MS)
             
             # --- Dealer Turn ---
-            game_session = get_game_session(sid) # Re-fetch
-            if not game_session or game_session.phase != GamePhase.DEALER_TURN:
+            if game_session.phase != GamePhase.DEALER_TURN:
                 logger.warning(f"Skipping Dealer turn for {sid}, invalid phase.")
                 return
 
-            eventlet.sleep(1) # Small delay for UX
             game_session.play_dealer_turn()
-            
-            save_game_session(game_session)
-            _send_game_state(sid, hide_dealer_first_card=False) # Reveal cards
 
             # DB操作は app_context の中で安全に行われる
-            user = User.query.filter_by(username="Player").first()
-            if user:
-                user.update_balance(game_session.player.balance)
+            # Only checkpoint the balance; rounds since the last checkpoint are
+            # lost if this worker dies (see BALANCE_CHECKPOINT_ROUNDS).
+            if (game_session.phase == GamePhase.GAME_OVER or
+                    game_session.rounds_played % BALANCE_CHECKPOINT_ROUNDS == 0):
+                _persist_balance(game_session)
+            
+            _save_and_send_game_state(sid, game_session, hide_dealer_first_card=False, # Reveal cards
+                                      reveal_delay_ms=REVEAL_DELAY_MS)
 
             if game_session.phase == GamePhase.GAME_OVER:
-                emit('game_over', {'message': 'You ran out of money! Game Over.'}, room=sid)
+                _emit_to_client(sid, 'game_over', {'message': 'You ran out of money! Game Over.'})
                 logger.info(f"Game Over for {sid} due to insufficient funds.")
 
         except (ValueError, IndexError) as e:
             db.session.rollback()
             logger.warning(f"AI/Dealer turn error for {sid}: {e}")
-            emit('error', {'message': str(e)}, room=sid)
+            _emit_to_client(sid, 'error', {'message': str(e)})
         except Exception as e:
             db.session.rollback()
             logger.exception(f"Unexpected error during AI/Dealer turn for {sid}")
-            emit('error', {'message': 'An unexpected error occurred during AI/Dealer turn.'}, room=sid)
+            _emit_to_client(sid, 'error', {'message': 'An unexpected error occurred during AI/Dealer turn.'})
 
 
 @socketio.on('reset_game')
@@ -291,18 +418,19 @@ def reset_game_event():
         return
     
     try:
-        user = User.get_or_create(username="Player")
-        user.update_balance(1000)
-        
         game_session = get_game_session(sid)
+
+        user = _get_session_user(game_session, create=True)
+        user.update_balance(1000)
         
         if not game_session:
             game_session = GameSession(sid, DIFFICULTY.MEDIUM, user.balance)
         else:
             game_session.reset_game(initial_balance=user.balance)
+        game_session.user_id = user.id
+        game_session.balance_dirty = False # Persisted by update_balance above
         
-        save_game_session(game_session)
-        _send_game_state(sid, hide_dealer_first_card=True)
+        _save_and_send_game_state(sid, game_session, hide_dealer_first_card=True)
         logger.info(f"Game session {sid} reset successfully.")
 
     except Exception as e:
@@ -4,6 +4,7 @@ This defines long-term persistent data, like User accounts.
 Short-term session data is handled by Redis.
 """
 from extensions import db
+from sqlalchemy import bindparam, select
 from datetime import datetime
 import logging
 
@@ -16,7 +17,7 @@ class User(db.Model):
     a game session.
     """
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
+    username = db.Column(db.String(80), unique=True, nullable=False, index=True)
     balance = db.Column(db.Integer, nullable=False, default=1000) # Initial balance
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -37,7 +38,7 @@ class User(db.Model):
         """
         Retrieves a user by username or creates a new one if it doesn't exist.
         """
-        user = cls.query.filter_by(username=username).first()
+        user = db.session.execute(_USER_BY_USERNAME, {'username': username}).scalar_one_or_none()
         if not user:
             try:
                 user = cls(username=username, balance=initial_balance)
@@ -53,10 +54,14 @@ class User(db.Model):
     def update_balance(self, new_balance: int):
         """
         Updates the user's balance and commits to the database.
+        Writes that would not change the balance are skipped.
         """
         if new_balance < 0:
             logger.warning(f"Attempted to set negative balance for user {self.username}: {new_balance}")
             new_balance = 0 # Don't allow negative balance
+
+        if new_balance == self.balance:
+            return
             
         self.balance = new_balance
         try:
@@ -65,4 +70,9 @@ class User(db.Model):
         except Exception as e:
             db.session.rollback()
             logger.error(f"Failed to update balance for {self.username}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+# Built once at import so every lookup reuses the same statement object and
+# hits SQLAlchemy's compiled-SQL cache; the username is bound per execute.
+_USER_BY_USERNAME = select(User).where(User.username == bindparam('username')).limit(1)
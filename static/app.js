@@ -153,10 +153,33 @@ document.addEventListener('DOMContentLoaded', () => {
         lobby.lobbyBalance.textContent = '1000';
     });
 
+    // 状態更新を到着順に描画するためのキュー
+    // game_over / error も同じキューに積み、遅延描画中の状態より先に表示されないようにする
+    let renderQueue = Promise.resolve();
+
+    function enqueueRender(task, delay = 0) {
+        renderQueue = renderQueue
+            .then(() => new Promise(resolve => setTimeout(resolve, delay)))
+            .then(task)
+            .catch(err => console.error('Failed to render game state:', err));
+    }
+
     /**
      * メインのゲーム状態更新 (仕様書 4. API)
+     * AI/ディーラーの手番はサーバーが reveal_delay_ms を指定するので、
+     * その分だけ待ってから描画する (演出用の遅延はクライアント側で行う)
+     * ペイロードは MessagePack のバイナリフレームで届く
      */
-    socket.on('game_state_update', (state) => {
+    socket.on('game_state_update', (payload) => {
+        const state = MessagePack.decode(new Uint8Array(payload));
+        enqueueRender(() => renderGameState(state), state.reveal_delay_ms || 0);
+    });
+
+    /**
+     * ゲーム状態を画面に反映する
+     * @param {object} state
+     */
+    function renderGameState(state) {
         console.log('Game state update:', state);
 
         // --- どのスクリーンを表示するか判断 ---
@@ -212,15 +235,15 @@ document.addEventListener('DOMContentLoaded', () => {
             game.betControls.classList.add('hidden'); // 非表示
         }
         // ▲▲▲ 修正ブロック ▲▲▲
-    });
+    }
 
     socket.on('game_over', (data) => {
-        showError(data.message);
-        // game_state_update が is_game_over: true で来るはず
+        // 直前の game_state_update (is_game_over: true) が描画されてから表示する
+        enqueueRender(() => showError(data.message));
     });
 
     socket.on('error', (data) => {
-        showError(data.message);
+        enqueueRender(() => showError(data.message));
     });
 
     function getPhaseMessage(phase) {
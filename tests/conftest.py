@@ -0,0 +1,67 @@
+"""
+Shared pytest fixtures.
+
+Configuration is read at import time, so the environment is prepared
+before any application module is imported.
+"""
+import os
+
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ.setdefault('FLASK_ENV', 'development')
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+
+import pytest
+from flask import Flask
+
+from extensions import db
+
+
+@pytest.fixture
+def app():
+    """A minimal app with an in-memory SQLite database (no Redis needed)."""
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        SQLALCHEMY_ENGINE_OPTIONS={},
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    with app.app_context():
+        import models # noqa: F401  (registers the tables)
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """An in-process fakeredis client standing in for the session store."""
+    import fakeredis
+    from game import routes
+
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(routes, 'redis_client', client)
+    return client
+
+
+@pytest.fixture
+def socket_client(app, redis, monkeypatch):
+    """
+    A Flask-SocketIO test client connected to `app` with the game blueprint.
+    Background tasks run inline, so a handler's AI/dealer turns have
+    finished by the time `emit` returns.
+    """
+    from extensions import socketio
+    from game.routes import game_bp
+
+    app.config['SECRET_KEY'] = 'test-secret-key'
+    app.register_blueprint(game_bp)
+    socketio.init_app(app)
+    monkeypatch.setattr(socketio, 'start_background_task',
+                        lambda target, *args, **kwargs: target(*args, **kwargs))
+
+    client = socketio.test_client(app)
+    yield client
+    if client.is_connected():
+        client.disconnect()
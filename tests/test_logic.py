@@ -0,0 +1,35 @@
+import pytest
+
+from game.logic import Deck
+
+
+def test_deal_cards_matches_repeated_deal_card():
+    deck = Deck()
+    twin = Deck(create_new=False)
+    twin.cards = list(deck.cards)
+
+    dealt = deck.deal_cards(6)
+
+    assert dealt == [twin.deal_card() for _ in range(6)]
+    assert deck.cards == twin.cards
+    assert deck.remaining_cards() == 46
+
+
+def test_deal_cards_rejects_zero_and_negative_counts():
+    deck = Deck()
+
+    for count in (0, -1):
+        with pytest.raises(ValueError):
+            deck.deal_cards(count)
+
+    assert deck.remaining_cards() == 52
+
+
+def test_deal_cards_rejects_overdealing():
+    deck = Deck()
+    deck.deal_cards(50)
+
+    with pytest.raises(IndexError):
+        deck.deal_cards(3)
+
+    assert deck.remaining_cards() == 2
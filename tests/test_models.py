@@ -0,0 +1,29 @@
+from extensions import db
+from models import User
+
+
+def test_update_balance_commits_changed_value(app):
+    user = User.get_or_create(username="Player")
+
+    user.update_balance(1500)
+
+    # Re-read from the database, not the identity map.
+    db.session.expire_all()
+    assert db.session.get(User, user.id).balance == 1500
+
+
+def test_update_balance_clamps_negative_to_zero(app):
+    user = User.get_or_create(username="Player")
+
+    user.update_balance(-50)
+
+    db.session.expire_all()
+    assert db.session.get(User, user.id).balance == 0
+
+
+def test_get_or_create_returns_existing_user(app):
+    first = User.get_or_create(username="Player", initial_balance=500)
+    second = User.get_or_create(username="Player", initial_balance=1000)
+
+    assert second.id == first.id
+    assert second.balance == 500
@@ -0,0 +1,177 @@
+from extensions import db, socketio
+from game import routes
+from game.logic import Card, DIFFICULTY, GamePhase, GameSession
+from models import User
+
+
+def _sid(socket_client):
+    """The Socket.IO sid the server assigned to `socket_client`."""
+    return socketio.server.manager.sid_from_eio_sid(socket_client.eio_sid, '/')
+
+
+def _seed_player_turn(sid, player_ranks, rounds_played=0):
+    """
+    Stores a session for `sid` on the player's turn with a 100 bet placed
+    against a 1000 DB balance. The dealer holds a 17 and will stand.
+    """
+    user = User.get_or_create(username="Player", initial_balance=1000)
+    game_session = GameSession(sid, DIFFICULTY.MEDIUM, initial_balance=1000)
+    game_session.user_id = user.id
+    game_session.player.place_bet(100)
+    for rank in player_ranks:
+        game_session.player.add_card(Card('Spades', rank))
+    game_session.dealer.add_card(Card('Hearts', 10))
+    game_session.dealer.add_card(Card('Hearts', 7))
+    game_session.phase = GamePhase.PLAYER_TURN
+    game_session.rounds_played = rounds_played
+    game_session.balance_dirty = True
+    routes.save_game_session(game_session)
+    return game_session
+
+
+def _db_balance():
+    # Re-read from the database, not the identity map.
+    db.session.expire_all()
+    return db.session.execute(db.select(User.balance)).scalar_one()
+
+
+def _finish_round(socket_client, player_ranks, rounds_played=0):
+    sid = _sid(socket_client)
+    _seed_player_turn(sid, player_ranks, rounds_played)
+    socket_client.emit('player_action', {'action': 'stand'})
+    return routes.get_game_session(sid)
+
+
+def test_balance_not_written_between_checkpoints(socket_client):
+    game_session = _finish_round(socket_client, [13, 12]) # 20 beats 17
+
+    assert game_session.rounds_played == 1
+    assert game_session.player.balance == 1100
+    assert game_session.balance_dirty
+    assert _db_balance() == 1000
+
+
+def test_balance_written_every_checkpoint_round(socket_client):
+    game_session = _finish_round(socket_client, [13, 12],
+                                 rounds_played=routes.BALANCE_CHECKPOINT_ROUNDS - 1)
+
+    assert game_session.rounds_played == routes.BALANCE_CHECKPOINT_ROUNDS
+    assert not game_session.balance_dirty
+    assert _db_balance() == 1100
+
+
+def test_balance_written_on_game_over(socket_client):
+    sid = _sid(socket_client)
+    user = User.get_or_create(username="Player")
+    user.update_balance(100)
+    game_session = GameSession(sid, DIFFICULTY.MEDIUM, initial_balance=100)
+    game_session.user_id = user.id
+    game_session.player.place_bet(100)
+    game_session.player.add_card(Card('Spades', 10))
+    game_session.player.add_card(Card('Spades', 2)) # 12 loses to 17
+    game_session.dealer.add_card(Card('Hearts', 10))
+    game_session.dealer.add_card(Card('Hearts', 7))
+    game_session.phase = GamePhase.PLAYER_TURN
+    game_session.balance_dirty = True
+    routes.save_game_session(game_session)
+
+    socket_client.emit('player_action', {'action': 'stand'})
+
+    game_session = routes.get_game_session(sid)
+    assert game_session.phase == GamePhase.GAME_OVER
+    assert not game_session.balance_dirty
+    assert _db_balance() == 0
+    assert 'game_over' in [packet['name'] for packet in socket_client.get_received()]
+
+
+def test_balance_written_on_disconnect(socket_client):
+    _finish_round(socket_client, [13, 12])
+    assert _db_balance() == 1000
+
+    socket_client.disconnect()
+
+    assert _db_balance() == 1100
+
+
+def test_session_stays_dirty_when_balance_write_fails(socket_client, monkeypatch):
+    def fail(self, new_balance):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(User, 'update_balance', fail)
+
+    game_session = _finish_round(socket_client, [13, 12],
+                                 rounds_played=routes.BALANCE_CHECKPOINT_ROUNDS - 1)
+
+    assert game_session.player.balance == 1100
+    assert game_session.balance_dirty
+    assert _db_balance() == 1000
+
+
+def test_start_game_after_round_end_keeps_unpersisted_balance(socket_client):
+    sid = _sid(socket_client)
+    game_session = _seed_player_turn(sid, [13, 12])
+    game_session.player.win_bet()
+    game_session.phase = GamePhase.ROUND_END
+    game_session.rounds_played = 1
+    # Fives all round: no blackjack, so the new round stops on the player's turn.
+    game_session.deck.cards = [Card('Clubs', 5)] * 20
+    routes.save_game_session(game_session)
+
+    socket_client.emit('start_game', {'difficulty': 'HARD', 'bet_amount': 10})
+
+    game_session = routes.get_game_session(sid)
+    assert game_session.phase == GamePhase.PLAYER_TURN
+    assert game_session.difficulty == DIFFICULTY.HARD
+    assert game_session.rounds_played == 1
+    assert game_session.player.balance == 1090 # 1100 kept, not reseeded from the DB
+    assert game_session.balance_dirty
+    assert _db_balance() == 1000
+
+
+def _state_updates(socket_client):
+    return [packet for packet in socket_client.get_received()
+            if packet['name'] == 'game_state_update']
+
+
+def test_unchanged_game_state_emit_is_skipped(socket_client):
+    sid = _sid(socket_client)
+    game_session = _seed_player_turn(sid, [13, 12])
+    socket_client.get_received()
+
+    routes._send_game_state(sid, game_session)
+    routes._send_game_state(sid, game_session)
+
+    assert len(_state_updates(socket_client)) == 1
+
+
+def test_unchanged_game_state_skip_survives_a_redis_round_trip(socket_client):
+    sid = _sid(socket_client)
+    game_session = _seed_player_turn(sid, [13, 12])
+    routes._save_and_send_game_state(sid, game_session)
+    socket_client.get_received()
+
+    routes._send_game_state(sid, routes.get_game_session(sid))
+
+    assert _state_updates(socket_client) == []
+
+
+def test_forced_game_state_emit_is_always_sent(socket_client):
+    sid = _sid(socket_client)
+    game_session = _seed_player_turn(sid, [13, 12])
+    routes._send_game_state(sid, game_session)
+    socket_client.get_received()
+
+    routes._send_game_state(sid, game_session, force=True)
+
+    assert len(_state_updates(socket_client)) == 1
+
+
+def test_reconnect_resends_unchanged_game_state(socket_client, monkeypatch):
+    # Pin the session id so the reconnected socket resumes the same session.
+    monkeypatch.setattr(routes, 'get_session_id_from_request', lambda: 'resume-sid')
+    game_session = _seed_player_turn('resume-sid', [13, 12])
+    routes._save_and_send_game_state('resume-sid', game_session)
+    socket_client.disconnect()
+
+    socket_client.connect()
+
+    assert len(_state_updates(socket_client)) == 1
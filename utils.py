@@ -2,6 +2,7 @@
 Utility functions and logging configuration for the BlackJack application.
 """
 import logging
+from flask import request
 from config import CurrentConfig
 
 def setup_logging():
@@ -22,6 +23,12 @@ def setup_logging():
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
+    # The format above never uses thread/process fields, so skip collecting
+    # them for every LogRecord.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
     # Suppress noisy logs from third-party libraries
     logging.getLogger('socketio').setLevel(logging.WARNING)
     logging.getLogger('engineio').setLevel(logging.WARNING)
@@ -34,6 +41,5 @@ def get_session_id_from_request():
     """
     Retrieves the unique session ID for the current client request (SocketIO).
     """
-    from flask import request
     # For SocketIO, request.sid is the unique ID for the client connection.
-    return request.sid if hasattr(request, 'sid') else None
\ No newline at end of file
+    return getattr(request, 'sid', None)
\ No newline at end of file
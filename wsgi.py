@@ -4,8 +4,6 @@ WSGI entry point for deploying the Flask BlackJack application.
 This file is responsible for creating the app instance,
 registering blueprints, and running the server.
 """
-import eventlet
-from eventlet import wsgi
 import logging
 import os
 import sys
@@ -16,11 +14,20 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 # --- 修正完了 ---
 
-# Patch standard library for async operations
-eventlet.monkey_patch()
+# config only depends on the standard library and python-dotenv,
+# so it is safe to import before monkey-patching.
+from config import CurrentConfig
+
+# Patch standard library for async operations.
+# This must run before the app, Redis and SQLAlchemy are imported.
+if CurrentConfig.SOCKETIO_ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+elif CurrentConfig.SOCKETIO_ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
 
 from app import create_app
-from config import CurrentConfig
 
 logger = logging.getLogger(__name__)
 
@@ -39,10 +46,10 @@ logger.info("Game blueprint registered successfully.")
 
 
 if __name__ == '__main__':
-    logger.info("Starting Eventlet WSGI server for local development...")
+    logger.info(f"Starting {CurrentConfig.SOCKETIO_ASYNC_MODE} WSGI server for local development...")
     
     host = '0.0.0.0'
-    port = int(os.environ.get('PORT', 5000))
+    port = CurrentConfig.PORT
     
     try:
         from extensions import socketio